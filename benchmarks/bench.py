@@ -0,0 +1,314 @@
+import os
+import sys
+import json
+import random
+import argparse
+import platform
+import time
+import gc
+import statistics
+import math
+
+# Headless: no window, no audio device
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "game"))
+
+import pygame
+import main as game
+
+# ---------------------------------------------------------
+# Micro-benchmarks for the game's hot paths.
+#
+#   python benchmarks/bench.py --save          record a baseline for this machine
+#   python benchmarks/bench.py                 compare against it
+#   python benchmarks/bench.py -k frame: -t 15 only frames, fail past +15%
+#
+# baseline.json is machine-specific and gitignored; --save creates it.
+# Every round is also timed next to a fixed reference() workload. A real
+# regression makes a benchmark slower both in raw time and relative to
+# reference(); machine-wide drift only moves one of the two. So a benchmark
+# fails only when both are past the threshold *and* outside their noise band
+# (NOISE_K standard errors of the medians), and still are after being re-timed
+# RETRIES times. Fast calls are batched so every one can be gated.
+# ---------------------------------------------------------
+
+BASELINE = os.path.join(HERE, "baseline.json")
+DEFAULT_THRESHOLD = 25.0  # percent slower than baseline that counts as a regression
+MIN_TIME = 0.025          # seconds per timing round (and as much again for reference())
+NOISE_K = 3.0             # standard errors of slowdown that still count as noise
+RETRIES = 3               # re-timings of a suspected regression before failing
+SAVE_PASSES = 5           # --save keeps the median of this many timings per benchmark
+SCENES = ("schoolyard", "classroom", "hallway", "plan_room", "finale")
+ENDINGS = ("REVEAL", "SAVE", "BOLD")
+
+def setup():
+    pygame.init()
+    screen = pygame.display.set_mode((game.WIDTH, game.HEIGHT))
+    pygame.font.init()
+    game.FONT = pygame.font.Font(None, 24)
+    game.BIG = pygame.font.Font(None, 40)
+    game.HUGE = pygame.font.Font(None, 64)
+    pygame.mixer.init(frequency=44100, size=-16, channels=1, buffer=512)
+    game.bake_particle_sprites()
+    game.state.mode = "play"
+    return screen
+
+def ending_texts():
+    game.set_scene("finale")
+    texts = {}
+    for kind in ENDINGS:
+        game.ending(kind)
+        texts[kind] = game.state.dialog_queue.pop().prompt
+    game.particles.clear()
+    game.state.flags["lights_cut"] = False
+    return texts
+
+def scatter_props(n, seed=1):
+    rnd = random.Random(seed)
+    return [game.Actor(f"prop{i}", "prop", rnd.randint(0, game.WIDTH), rnd.randint(0, game.HEIGHT))
+            for i in range(n)]
+
+def frame_bench(screen, scene, dark=False):
+    def run():
+        game.draw_play_frame(screen)
+
+    def prepare():
+        game.state = game.GameState()
+        game.state.mode = "play"
+        game.set_scene(scene)
+        game.state.flags["holo_glitch"] = dark
+        game.state.flags["lights_cut"] = dark
+        game.state.push_dialog(game.DialogChoice(
+            "The lights are off. The audio is dead. The teacher is glitching.",
+            ["One", "Two", "Three"], lambda idx: None))
+        game.state.next_dialog()
+        for _ in range(5):
+            run()
+    return prepare, run
+
+def build_benchmarks(screen):
+    benches = []  # (name, prepare, run, calls per run)
+
+    def add(name, run, prepare=None, batch=1):
+        # batch tiny calls so one run takes ~1 ms or more and times reliably
+        if batch > 1:
+            def run(fn=run, batch=batch):
+                for _ in range(batch):
+                    fn()
+        benches.append((name, prepare, run, batch))
+
+    for wave in ("sine", "square", "triangle"):
+        add(f"wave:{wave}", lambda w=wave: game.generate_wave_buffer(330, 100, 0.1, wave=w))
+        add(f"arpeggio:{wave}",
+            lambda w=wave: game.make_arpeggio([220, 261, 330, 261], ms_per_note=50, volume=0.1, wave=w))
+
+    texts = ending_texts()
+    for kind, text in texts.items():
+        add(f"wrap_lines:{kind}", lambda t=text: game.wrap_lines(t, game.WIDTH - 120, game.FONT))
+
+    player = game.Actor("You", "player", 500, 300)
+    for n, batch in ((5, 1000), (50, 100), (500, 10)):
+        crowd = scatter_props(n)
+        add(f"nearest_interactable:{n}", lambda c=crowd: game.nearest_interactable(player, c), batch=batch)
+
+    teacher = game.Actor("Mr. Smith", "npc", 500, 300, radius=20, color=game.PURPLE)
+    kid = game.Actor("Susan Simmons", "npc", 500, 300, color=game.GREEN)
+    door = game.Actor("School Door", "prop", 500, 300, radius=34)
+    add("draw_alien_teacher", lambda: game.draw_alien_teacher(screen, 500, 300), batch=100)
+    add("draw_little_person", lambda: game.draw_little_person(screen, 500, 300, game.GREEN), batch=300)
+    add("draw_actor:teacher", lambda: game.draw_actor(screen, teacher), batch=100)
+    add("draw_actor:npc", lambda: game.draw_actor(screen, kid), batch=300)
+    add("draw_actor:prop", lambda: game.draw_actor(screen, door), batch=1000)
+
+    def prepare_ui():
+        game.state = game.GameState()
+        game.state.mode = "play"
+        game.set_scene("classroom")
+        game.state.set_toast("Mr. Smith: “Observe carefully… and learn quickly.”", 10**9)
+        game.state.push_dialog(game.DialogChoice(texts["REVEAL"], ["Restart", "Restart", "Restart"], lambda idx: None))
+        game.state.next_dialog()
+
+    def ui():
+        game.draw_ui(screen, game.player, game.props)
+        game.draw_dialog(screen)
+    add("draw_ui+draw_dialog", ui, prepare_ui)
+
+    for scene in SCENES:
+        prepare, run = frame_bench(screen, scene)
+        add(f"frame:{scene}", run, prepare)
+    prepare, run = frame_bench(screen, "finale", dark=True)
+    add("frame:finale_dark", run, prepare)
+    return benches
+
+def reference():
+    # fixed pure-Python workload timed next to every round; dividing by it
+    # cancels machine-wide slow spells (other load, frequency scaling)
+    x = 0.0
+    for i in range(300):
+        x += math.sin(i) * i
+    return x
+
+def _calibrate(fn):
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - t0 >= MIN_TIME:
+            return number
+        number *= 2
+
+def time_it(run, repeat, batch=1):
+    gc.collect()
+    gc.disable()  # same as timeit: keep collector pauses out of the numbers
+    try:
+        return _time_it(run, repeat, batch)
+    finally:
+        gc.enable()
+
+def _time_it(run, repeat, batch):
+    number = _calibrate(run)
+    ref_number = _calibrate(reference)
+    per_call, ratios = [], []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(ref_number):
+            reference()
+        ref = (time.perf_counter() - t0) / ref_number
+        t0 = time.perf_counter()
+        for _ in range(number):
+            run()
+        t = (time.perf_counter() - t0) / number / batch
+        per_call.append(t)
+        ratios.append(t / ref)
+    # median, not min: one lucky round shouldn't set a baseline nothing can match
+    u1, us, u3 = statistics.quantiles(per_call, n=4)
+    q1, rel, q3 = statistics.quantiles(ratios, n=4)
+    return {
+        "us": us * 1e6,
+        "us_iqr": (u3 - u1) * 1e6,
+        "rel": rel,  # cost in units of reference()
+        "rel_iqr": q3 - q1,
+        "rounds": repeat,
+    }
+
+def change_pct(cur, old, key="rel"):
+    return (cur[key] - old[key]) / old[key] * 100.0
+
+def median_stderr(r, key):
+    # standard error of a median, from the IQR (normal approximation)
+    return 0.93 * r[key + "_iqr"] / math.sqrt(r["rounds"])
+
+def _slower(cur, old, threshold, key):
+    noise = NOISE_K * math.hypot(median_stderr(cur, key), median_stderr(old, key))
+    return change_pct(cur, old, key) > threshold and cur[key] - old[key] > noise
+
+def is_regression(cur, old, threshold):
+    return _slower(cur, old, threshold, "us") and _slower(cur, old, threshold, "rel")
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_baseline(path, results):
+    data = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "unit": "us",
+        },
+        "results": {k: {f: round(v, 4) for f, v in r.items()} for k, r in results.items()},
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Headless micro-benchmarks for My Teacher Is an Alien")
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--save", action="store_true", help="write results as the new baseline")
+    ap.add_argument("-t", "--threshold", type=float, default=DEFAULT_THRESHOLD,
+                    help="fail when a benchmark is this many percent slower than baseline")
+    ap.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this")
+    ap.add_argument("-r", "--repeat", type=int, default=15)
+    args = ap.parse_args(argv)
+
+    screen = setup()
+    baseline = None if args.save else load_baseline(args.baseline)
+    # entries from an older format are ignored; re-run --save
+    base = {k: v for k, v in (baseline["results"] if baseline else {}).items()
+            if isinstance(v, dict) and "us_iqr" in v}
+
+    results = {}
+    regressions = []
+    print(f"{'benchmark':<28} {'us/call':>12} {'baseline':>12} {'change':>9} {'change*':>9}")
+    for name, prepare, run, batch in build_benchmarks(screen):
+        if args.filter not in name:
+            continue
+        if prepare:
+            prepare()
+        cur = time_it(run, args.repeat, batch)
+        if args.save:
+            # a baseline is one measurement every later run is judged by; take the middle of a few
+            passes = [cur]
+            for _ in range(SAVE_PASSES - 1):
+                if prepare:
+                    prepare()
+                passes.append(time_it(run, args.repeat, batch))
+            cur = dict(cur)
+            for key in ("us", "rel"):
+                mid = sorted(passes, key=lambda r: r[key])[len(passes) // 2]
+                cur[key], cur[key + "_iqr"] = mid[key], mid[key + "_iqr"]
+        old = base.get(name)
+        if old:
+            retries = 0
+            while is_regression(cur, old, args.threshold) and retries < RETRIES:
+                # could be a noisy moment: time it again and keep the better run
+                retries += 1
+                if prepare:
+                    prepare()
+                again = time_it(run, args.repeat, batch)
+                if not is_regression(again, old, args.threshold) or again["rel"] < cur["rel"]:
+                    cur = again
+            flag = ""
+            if is_regression(cur, old, args.threshold):
+                flag = "  REGRESSION"
+                regressions.append(name)
+            elif retries:
+                flag = f"  (noise, re-timed {retries}x)"
+            print(f"{name:<28} {cur['us']:12.2f} {old['us']:12.2f} {change_pct(cur, old, 'us'):+8.1f}% "
+                  f"{change_pct(cur, old):+8.1f}%{flag}")
+        else:
+            print(f"{name:<28} {cur['us']:12.2f} {'-':>12}")
+        results[name] = cur
+    print("change* is relative to reference(); a regression has to show in both columns")
+
+    pygame.quit()
+
+    if args.save:
+        if args.filter:
+            # partial run: keep the other entries
+            old = load_baseline(args.baseline)
+            results = {**(old["results"] if old else {}), **results}
+        save_baseline(args.baseline, results)
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"no baseline at {args.baseline}; run with --save to create one")
+        return 0
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed more than {args.threshold:g}% "
+              f"and outside the noise band: {', '.join(regressions)}")
+        return 1
+    print(f"ok: nothing regressed more than {args.threshold:g}%")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,8 +2,19 @@ import pygame
 import random
 import math
 import asyncio
+import os
+import time
+import types
+import weakref
+import gc
+from collections import OrderedDict
 from array import array
 
+try:
+    import tracemalloc
+except ImportError:  # not every wasm build ships it
+    tracemalloc = None
+
 # ---------------------------------------------------------
 # My Teacher Is an Alien (Final Fixed Version)
 # ---------------------------------------------------------
@@ -30,14 +41,249 @@ PAPER = (210, 210, 210)
 
 WORLD = pygame.Rect(0, 0, WIDTH, HEIGHT)
 
+# ---------------- Memory accounting ----------------
+# Explicit byte counts for things tracemalloc can't see (SDL surfaces, mixer
+# sounds, fonts) plus tracemalloc for the Python side. F3 shows the overlay,
+# F4 prints the snapshot diff from the last scene transition.
+
+MEM_CATEGORIES = ("audio", "surfaces", "fonts", "scene")
+# measured with tracemalloc, so already part of "python"; never summed
+MEM_TRACED = ("scene",)
+# sizes we can only estimate (shown with a ~)
+MEM_ESTIMATED = ("fonts",)
+TRACE_MEMORY = False
+
+_mem_live = {c: 0 for c in MEM_CATEGORIES}
+_mem_peak_by_scene = {}
+_mem_scene = None
+_mem_snapshot = None
+_mem_last_diff = []
+show_memory = False
+
+def _untrack(category, nbytes):
+    _mem_live[category] -= nbytes
+
+def track_memory(obj, category, nbytes):
+    _mem_live[category] += nbytes
+    weakref.finalize(obj, _untrack, category, nbytes)
+    _mem_update_peak()
+    return obj
+
+def surface_bytes(surf):
+    return surf.get_pitch() * surf.get_height()
+
+# estimate: each Font loads its own face from the file, so charge the file
+# size per font; glyph caches are not counted
+def font_bytes(font_path=None):
+    try:
+        if font_path is None:
+            font_path = os.path.join(os.path.dirname(pygame.__file__), pygame.font.get_default_font())
+        return os.path.getsize(font_path)
+    except (OSError, TypeError):
+        return 0
+
+def traced_bytes():
+    if tracemalloc and tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    return 0
+
+def start_memory_tracing():
+    if tracemalloc and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def _mem_untraced_total():
+    return sum(n for c, n in _mem_live.items() if c not in MEM_TRACED)
+
+def _mem_update_peak():
+    if _mem_scene is None:
+        return
+    total = _mem_untraced_total()
+    if tracemalloc and tracemalloc.is_tracing():
+        total += tracemalloc.get_traced_memory()[1]
+    if total > _mem_peak_by_scene.get(_mem_scene, 0):
+        _mem_peak_by_scene[_mem_scene] = total
+
+def memory_note_scene(scene_name):
+    global _mem_scene, _mem_snapshot, _mem_last_diff
+    _mem_update_peak()
+    if tracemalloc and tracemalloc.is_tracing():
+        # Sprite <-> Group cycles keep the old scene alive until the collector
+        # runs; without this the diff shows it as a leak
+        gc.collect()
+        snap = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, weakref.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        if _mem_snapshot is not None:
+            stats = snap.compare_to(_mem_snapshot, "lineno")
+            header = f"{_mem_scene} -> {scene_name}"
+            _mem_last_diff = [header] + [str(st) for st in stats if st.size_diff][:15]
+        _mem_snapshot = snap
+        tracemalloc.reset_peak()
+    _mem_scene = scene_name
+    _mem_update_peak()
+
+def memory_report():
+    live = {c: n for c, n in _mem_live.items() if c not in MEM_TRACED}
+    live["python"] = traced_bytes()
+    return {
+        "scene": _mem_scene,
+        "live": live,
+        "python_breakdown": {c: _mem_live[c] for c in MEM_TRACED},
+        "total": sum(live.values()),
+        "peak_by_scene": dict(_mem_peak_by_scene),
+        "estimated": MEM_ESTIMATED,
+        "tracing": bool(tracemalloc and tracemalloc.is_tracing()),
+    }
+
+def dump_memory_diff():
+    if not _mem_last_diff:
+        print("[mem] no scene transition recorded yet (tracing on?)")
+    for line in _mem_last_diff:
+        print("[mem]", line)
+    return list(_mem_last_diff)
+
+# ---------------- Background jobs ----------------
+# Cooperative jobs run in whatever is left of the frame after update/draw.
+# A job is a generator (yield a 0..1 progress value, or None) or a coroutine
+# that awaits job_pause(progress). Higher priority runs first, equal
+# priorities take turns, and at least one step runs per frame so nothing
+# starves when the game is running behind.
+
+JOB_LOW, JOB_NORMAL, JOB_HIGH = 0, 1, 2
+FRAME_BUDGET_MS = 1000.0 / FPS
+JOB_RESERVE_MS = 4.0  # left for flip() and the browser
+
+@types.coroutine
+def job_pause(progress=None):
+    yield progress
+
+class Job:
+    def __init__(self, name, work, priority=JOB_NORMAL, on_done=None):
+        self.name = name
+        self.work = work
+        self.priority = priority
+        self.on_done = on_done
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.done = False
+        self.cancelled = False
+        self.cost = 0.0  # seconds the last step took
+
+    def cancel(self):
+        if not self.done:
+            self.cancelled = True
+            self.done = True
+            self.work.close()
+
+    def step(self):
+        try:
+            p = self.work.send(None)
+        except StopIteration as e:
+            self.finish(e.value)
+            return
+        except Exception as e:
+            self.fail(e)
+            return
+        if p is not None:
+            self.progress = p
+
+    def finish(self, result):
+        self.result = result
+        self.progress = 1.0
+        self.done = True
+        if self.on_done:
+            try:
+                self.on_done(result)
+            except Exception as e:
+                self.fail(e)
+
+    def fail(self, error):
+        self.error = error
+        self.done = True
+        print(f"[jobs] {self.name} failed: {error!r}")
+
+class JobScheduler:
+    def __init__(self):
+        self.jobs = []
+        self.batch = []  # everything submitted since the scheduler was last idle
+
+    def submit(self, name, work, priority=JOB_NORMAL, on_done=None):
+        if not self.busy():
+            self.batch = []
+        job = Job(name, work, priority, on_done)
+        self.jobs.append(job)
+        self.batch.append(job)
+        return job
+
+    def cancel(self, name):
+        for job in self.jobs:
+            if job.name == name:
+                job.cancel()
+
+    def busy(self):
+        return any(not j.done for j in self.jobs)
+
+    def get(self, name):
+        for job in self.jobs:
+            if job.name == name and not job.done:
+                return job
+        return None
+
+    def progress(self):
+        return {j.name: j.progress for j in self.jobs if not j.done}
+
+    def overall_progress(self):
+        # finished, failed and cancelled jobs count as complete so this never goes back
+        if not self.batch:
+            return 1.0
+        return sum(1.0 if j.done else j.progress for j in self.batch) / len(self.batch)
+
+    def run(self, deadline):
+        steps = 0
+        while True:
+            self.jobs = [j for j in self.jobs if not j.done]
+            if not self.jobs or (steps and time.perf_counter() >= deadline):
+                return steps
+            top = max(j.priority for j in self.jobs)
+            job = next(j for j in self.jobs if j.priority == top)
+            t0 = time.perf_counter()
+            # don't start a step that won't fit in what's left of the frame
+            if steps and t0 + job.cost >= deadline:
+                return steps
+            job.step()
+            job.cost = time.perf_counter() - t0
+            steps += 1
+            # round-robin: the job that just ran goes to the back of the line
+            self.jobs.remove(job)
+            self.jobs.append(job)
+
+def run_background_jobs(frame_start, dt_ms):
+    budget = FRAME_BUDGET_MS - JOB_RESERVE_MS
+    if dt_ms > FRAME_BUDGET_MS * 1.5:
+        budget = 0  # already behind: one step, no more
+    return jobs.run(frame_start + budget / 1000.0)
+
+def run_job_now(work):
+    try:
+        while True:
+            work.send(None)
+    except StopIteration as e:
+        return e.value
+
+jobs = JobScheduler()
+
 # ---------------- Audio (Procedural Music) ----------------
 
 def _clamp16(n: int) -> int:
     return max(-32768, min(32767, n))
 
-def generate_wave_buffer(freq_hz, ms, volume=0.25, sample_rate=44100, wave="sine"):
+WAVE_CHUNK = 384  # samples per job slice; well under a millisecond natively
+
+def fill_wave(buf, freq_hz, ms, volume=0.25, sample_rate=44100, wave="sine", chunk=WAVE_CHUNK):
     n_samples = int(sample_rate * (ms / 1000.0))
-    buf = array("h")
     amp = int(32767 * volume)
     
     for i in range(n_samples):
@@ -51,24 +297,55 @@ def generate_wave_buffer(freq_hz, ms, volume=0.25, sample_rate=44100, wave="sine
         else:
             v = int(amp * math.sin(2 * math.pi * freq_hz * t))
         buf.append(_clamp16(v))
+        if i % chunk == chunk - 1:
+            yield (i + 1) / n_samples
+
+def generate_wave_buffer(freq_hz, ms, volume=0.25, sample_rate=44100, wave="sine"):
+    buf = array("h")
+    run_job_now(fill_wave(buf, freq_hz, ms, volume, sample_rate, wave))
     return buf
 
 def make_tone(freq_hz=440, ms=150, volume=0.25, wave="sine"):
     buf = generate_wave_buffer(freq_hz, ms, volume, wave=wave)
-    return pygame.mixer.Sound(buffer=buf.tobytes())
+    snd = pygame.mixer.Sound(buffer=buf.tobytes())
+    return track_memory(snd, "audio", len(buf) * buf.itemsize)
 
-def make_arpeggio(notes, ms_per_note=300, volume=0.15, wave="triangle"):
+def make_arpeggio_job(notes, ms_per_note=300, volume=0.15, wave="triangle"):
     full_buf = array("h")
-    for freq in notes:
-        full_buf.extend(generate_wave_buffer(freq, ms_per_note, volume, wave=wave))
-        full_buf.extend(generate_wave_buffer(0, 20, 0)) 
-    return pygame.mixer.Sound(buffer=full_buf.tobytes())
+    for k, freq in enumerate(notes):
+        for p in fill_wave(full_buf, freq, ms_per_note, volume, wave=wave):
+            yield (k + p) / len(notes)
+        yield from fill_wave(full_buf, 0, 20, 0)
+    snd = pygame.mixer.Sound(buffer=full_buf.tobytes())
+    return track_memory(snd, "audio", len(full_buf) * full_buf.itemsize)
+
+def make_arpeggio(notes, ms_per_note=300, volume=0.15, wave="triangle"):
+    return run_job_now(make_arpeggio_job(notes, ms_per_note, volume, wave))
 
 SFX_SELECT = None
 SFX_INTERACT = None
 ROOM_MUSIC = {}
 _current_music = None
 
+# scene -> (notes, ms_per_note, volume); synthesized in the background
+ROOM_MUSIC_SPECS = {
+    "schoolyard": ([220, 261, 330, 261], 350, 0.10),
+    "classroom":  ([246, 293, 246, 196], 400, 0.10),
+    "hallway":    ([196, 220, 196, 164], 400, 0.10),
+    "plan_room":  ([262, 330, 392, 330], 300, 0.10),
+    "finale":     ([146, 174, 146, 130], 250, 0.12),
+}
+
+def music_ready(scene_name, snd):
+    ROOM_MUSIC[scene_name] = snd
+    if state.mode == "play" and state.scene == scene_name:
+        start_room_music(scene_name)
+
+def queue_room_music():
+    for name, (notes, ms, volume) in ROOM_MUSIC_SPECS.items():
+        jobs.submit(f"music:{name}", make_arpeggio_job(notes, ms_per_note=ms, volume=volume),
+                    priority=JOB_LOW, on_done=lambda snd, name=name: music_ready(name, snd))
+
 def start_room_music(scene_name: str):
     global _current_music
     if not pygame.mixer.get_init():
@@ -123,6 +400,7 @@ class Actor(pygame.sprite.Sprite):
 
         size = radius * 2 + 60
         self.image = pygame.Surface((size, size), pygame.SRCALPHA)
+        track_memory(self.image, "surfaces", surface_bytes(self.image))
         self.rect = self.image.get_rect(center=(x, y))
 
     def update(self):
@@ -163,6 +441,8 @@ class GameState:
             "got_help": False,
             "made_plan": False,
             "ready_finale": False,
+            "holo_glitch": False,
+            "lights_cut": False,
         }
 
     def set_toast(self, msg, frames=180):
@@ -180,6 +460,92 @@ class GameState:
 
 state = GameState()
 
+# ---------------- Camera & world chunks ----------------
+# Scenes live in world space (SCENE_SIZES). Scenes bigger than the screen get
+# their static background cut into CHUNK_SIZE tiles that are rendered on first
+# use and evicted LRU; one-screen scenes just draw it. Actors outside the
+# viewport are culled before draw_actor.
+
+SCENE_SIZES = {
+    "hallway": (2000, HEIGHT),
+}
+CHUNK_SIZE = 256
+CULL_MARGIN = 48  # teacher antennae/pointer reach past the actor rect
+
+class Camera:
+    def __init__(self):
+        self.rect = pygame.Rect(0, 0, WIDTH, HEIGHT)
+
+    def snap(self, target):
+        self.rect.center = target.center
+        self.rect.clamp_ip(WORLD)
+
+    def follow(self, target, ease=0.15):
+        tx, ty = target.center
+        cx, cy = self.rect.center
+        self.rect.center = (cx + round((tx - cx) * ease), cy + round((ty - cy) * ease))
+        self.rect.clamp_ip(WORLD)
+
+    def offset(self):
+        return self.rect.x, self.rect.y
+
+    def visible(self, r, margin=CULL_MARGIN):
+        return self.rect.inflate(margin * 2, margin * 2).colliderect(r)
+
+camera = Camera()
+
+def scene_floor_color(scene_name):
+    if scene_name == "schoolyard":
+        return (25, 50, 40)
+    elif scene_name == "classroom":
+        return (30, 45, 55)
+    elif scene_name == "hallway":
+        return (45, 35, 35)
+    elif scene_name == "plan_room":
+        return (30, 30, 45)
+    return (35, 25, 40)
+
+def draw_floor(surf, scene_name, wx, wy):
+    w, h = surf.get_size()
+    surf.fill(scene_floor_color(scene_name))
+    top = max(0, 72 - wy)
+    for x in range(-(-wx // 80) * 80, wx + w, 80):
+        pygame.draw.line(surf, (0, 0, 0), (x - wx, top), (x - wx, h), 1)
+
+def render_chunk(scene_name, cx, cy):
+    surf = pygame.Surface((CHUNK_SIZE, CHUNK_SIZE))
+    if pygame.display.get_surface():
+        surf = surf.convert()
+    draw_floor(surf, scene_name, cx * CHUNK_SIZE, cy * CHUNK_SIZE)
+    return track_memory(surf, "surfaces", surface_bytes(surf))
+
+def view_chunks(world_w, world_h):
+    # most tiles one view can touch in this world: 5x3 for the 2000x650 hallway
+    cols = min(-(-world_w // CHUNK_SIZE), (WIDTH - 1) // CHUNK_SIZE + 2)
+    rows = min(-(-world_h // CHUNK_SIZE), (HEIGHT - 1) // CHUNK_SIZE + 2)
+    return cols * rows
+
+class ChunkCache:
+    def __init__(self, max_chunks=0):
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()
+
+    def get(self, scene_name, cx, cy):
+        key = (scene_name, cx, cy)
+        surf = self.chunks.get(key)
+        if surf is None:
+            surf = self.chunks[key] = render_chunk(scene_name, cx, cy)
+            while len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)
+        else:
+            self.chunks.move_to_end(key)
+        return surf
+
+    def clear(self):
+        self.chunks.clear()
+
+chunk_cache = ChunkCache()
+
 # ---------------- Drawing ----------------
 
 def draw_little_person(screen, x, y, body_color, scale=1.0):
@@ -217,10 +583,14 @@ def draw_alien_teacher(screen, x, y, scale=1.0, with_pointer=True):
 def draw_prop(screen, x, y, r, color):
     pygame.draw.circle(screen, color, (x, y), r)
 
-def draw_actor(screen, a: Actor):
+def draw_actor(screen, a: Actor, offset=(0, 0)):
     x, y = a.rect.center
+    x -= offset[0]
+    y -= offset[1]
     r = a.radius
     if a.name == "Mr. Smith":
+        if state.flags["holo_glitch"] and random.random() < 0.2:
+            x += random.randint(-6, 6)
         draw_alien_teacher(screen, x, y, scale=1.0, with_pointer=True)
     elif a.kind in ("player", "npc"):
         body_color = a.color
@@ -229,6 +599,220 @@ def draw_actor(screen, a: Actor):
     else:
         draw_prop(screen, x, y, r, a.color)
 
+# ---------------- Effects (Particles) ----------------
+# Fixed-size pool in flat arrays: no per-particle objects, dead particles are
+# swap-removed, and the whole pool is drawn with one blits() call. If update +
+# draw goes over PARTICLE_BUDGET_MS the pool lowers its quality (fewer spawns,
+# fewer drawn) instead of dropping frames, and recovers when there's headroom.
+
+PARTICLE_CAP = 600
+PARTICLE_BUDGET_MS = 3.0
+
+FX_GLITCH, FX_SPARKLE, FX_CONFETTI = 0, 1, 2
+CONFETTI_COLORS = [(235, 90, 90), (230, 210, 80), (80, 200, 120), (90, 150, 235), (200, 110, 220)]
+
+# per-sprite gravity and drag, parallel to PARTICLE_SPRITES
+PARTICLE_SPRITES = []
+_P_GRAVITY = array("f")
+_P_DRAG = array("f")
+
+def bake_particle_sprites():
+    PARTICLE_SPRITES.clear()
+    del _P_GRAVITY[:], _P_DRAG[:]
+
+    def add(surf, gravity, drag):
+        surf = surf.convert_alpha() if pygame.display.get_surface() else surf
+        track_memory(surf, "surfaces", surface_bytes(surf))
+        PARTICLE_SPRITES.append(surf)
+        _P_GRAVITY.append(gravity)
+        _P_DRAG.append(drag)
+
+    for color in (CYAN, (220, 80, 200), WHITE):
+        s = pygame.Surface((14, 3), pygame.SRCALPHA)
+        s.fill((*color, 200))
+        add(s, 0.0, 0.6)
+    for color in (WHITE, (250, 240, 170)):
+        s = pygame.Surface((7, 7), pygame.SRCALPHA)
+        pygame.draw.line(s, color, (3, 0), (3, 6))
+        pygame.draw.line(s, color, (0, 3), (6, 3))
+        s.set_at((3, 3), (255, 255, 255))
+        add(s, -0.02, 0.96)
+    for color in CONFETTI_COLORS:
+        s = pygame.Surface((5, 4), pygame.SRCALPHA)
+        s.fill(color)
+        add(s, 0.12, 0.98)
+
+# effect -> range of sprite indices baked above
+FX_SPRITE_RANGE = {FX_GLITCH: (0, 3), FX_SPARKLE: (3, 5), FX_CONFETTI: (5, 5 + len(CONFETTI_COLORS))}
+
+class ParticlePool:
+    def __init__(self, capacity=PARTICLE_CAP):
+        self.capacity = capacity
+        self.x = array("f", bytes(4 * capacity))
+        self.y = array("f", bytes(4 * capacity))
+        self.vx = array("f", bytes(4 * capacity))
+        self.vy = array("f", bytes(4 * capacity))
+        self.life = array("h", bytes(2 * capacity))
+        self.sprite = array("B", bytes(capacity))
+        self.count = 0
+        self.quality = 1.0
+        # one reusable [sprite, rect] blit entry per slot, updated in place
+        self._blits = [[None, pygame.Rect(0, 0, 0, 0)] for _ in range(capacity)]
+
+    def clear(self):
+        self.count = 0
+
+    def emit(self, effect, x, y, n, speed=2.0, life=40, spread=0):
+        n = min(int(n * self.quality), self.capacity - self.count)
+        if n <= 0 or not PARTICLE_SPRITES:
+            return 0
+        lo, hi = FX_SPRITE_RANGE[effect]
+        i = self.count
+        for _ in range(n):
+            ang = random.uniform(0, 2 * math.pi)
+            spd = random.uniform(0.3, 1.0) * speed
+            self.x[i] = x + random.uniform(-spread, spread)
+            self.y[i] = y + random.uniform(-spread, spread)
+            if effect == FX_GLITCH:
+                self.vx[i] = random.choice((-1, 1)) * spd
+                self.vy[i] = 0.0
+            else:
+                self.vx[i] = math.cos(ang) * spd
+                self.vy[i] = math.sin(ang) * spd - (speed if effect == FX_CONFETTI else 0)
+            self.life[i] = random.randint(life // 2, life)
+            self.sprite[i] = random.randrange(lo, hi)
+            i += 1
+        self.count = i
+        return n
+
+    def update(self):
+        x, y, vx, vy, life, sprite = self.x, self.y, self.vx, self.vy, self.life, self.sprite
+        grav, drag = _P_GRAVITY, _P_DRAG
+        i = 0
+        n = self.count
+        while i < n:
+            life[i] -= 1
+            if life[i] <= 0:
+                n -= 1
+                x[i], y[i], vx[i], vy[i] = x[n], y[n], vx[n], vy[n]
+                life[i], sprite[i] = life[n], sprite[n]
+                continue
+            k = sprite[i]
+            vx[i] *= drag[k]
+            vy[i] = vy[i] * drag[k] + grav[k]
+            x[i] += vx[i]
+            y[i] += vy[i]
+            i += 1
+        self.count = n
+
+    def draw(self, screen, offset=(0, 0)):
+        # at lower quality only every Nth particle is drawn
+        step = 1 if self.quality >= 0.75 else (2 if self.quality >= 0.4 else 3)
+        sprites, x, y, sprite = PARTICLE_SPRITES, self.x, self.y, self.sprite
+        ox, oy = offset
+        blits = self._blits
+        n = 0
+        for i in range(0, self.count, step):
+            entry = blits[n]
+            entry[0] = sprites[sprite[i]]
+            r = entry[1]
+            r.x = int(x[i]) - ox
+            r.y = int(y[i]) - oy
+            n += 1
+        if n:
+            screen.blits(blits[:n], doreturn=False)
+
+    def step(self, screen, offset=(0, 0), budget_ms=PARTICLE_BUDGET_MS):
+        if not self.count:
+            self.quality = 1.0  # idle: the next burst starts at full strength
+            return
+        t0 = time.perf_counter()
+        self.update()
+        self.draw(screen, offset)
+        spent = (time.perf_counter() - t0) * 1000.0
+        if spent > budget_ms:
+            self.quality = max(0.2, self.quality * 0.8)
+        elif spent < budget_ms * 0.5:
+            self.quality = min(1.0, self.quality + 0.02)
+
+particles = ParticlePool()
+
+def find_actor(name):
+    for a in props:
+        if a.name == name:
+            return a
+    return None
+
+def update_effects():
+    if state.scene == "finale" and state.flags["holo_glitch"]:
+        teacher = find_actor("Mr. Smith")
+        if teacher and random.random() < 0.35:
+            tx, ty = teacher.rect.center
+            particles.emit(FX_GLITCH, tx + random.randint(-20, 20), ty - random.randint(0, 70), 4, speed=3.0, life=10)
+
+# ---------------- Lighting ----------------
+# Multiply-style lighting: a reused overlay is filled with the ambient level,
+# cached radial masks are added on top with BLEND_RGB_ADD, then the overlay is
+# multiplied onto the frame. A few blits per frame, no per-pixel Python.
+
+DARK_AMBIENT = (28, 28, 40)
+PLAYER_LIGHT = (255, 230, 190)
+
+_light_masks = {}
+_light_overlay = None
+
+def get_light_mask(radius, color):
+    key = (radius, color)
+    mask = _light_masks.get(key)
+    if mask is None:
+        mask = pygame.Surface((radius * 2, radius * 2))
+        mask.fill((0, 0, 0))
+        steps = max(8, radius // 3)
+        for i in range(steps):
+            rr = radius * (steps - i) / steps
+            f = (1.0 - rr / radius) ** 0.8 if i else 0.0
+            pygame.draw.circle(mask, [int(c * f) for c in color], (radius, radius), max(1, int(rr)))
+        if pygame.display.get_surface():
+            mask = mask.convert()
+        _light_masks[key] = track_memory(mask, "surfaces", surface_bytes(mask))
+    return mask
+
+def lights_out():
+    return state.scene == "finale" and state.flags["lights_cut"]
+
+def scene_lights():
+    lights = [(*player.rect.center, 130, PLAYER_LIGHT)]
+    for a in props:
+        x, y = a.rect.center
+        if a.name == "Mr. Smith":
+            # eyes and antenna tips from draw_alien_teacher
+            lights.append((x - 9, y - 42, 22, CYAN))
+            lights.append((x + 9, y - 42, 22, CYAN))
+            lights.append((x - 18, y - 82, 34, CYAN))
+            lights.append((x + 18, y - 82, 34, CYAN))
+        elif a.name == "Stage Control":
+            lights.append((x, y, 90, YELLOW))
+    return lights
+
+def draw_lighting(screen, offset=(0, 0)):
+    global _light_overlay
+    if not lights_out():
+        _light_overlay = None  # 2.5 MB we don't need while the lights are on
+        return
+    if _light_overlay is None or _light_overlay.get_size() != screen.get_size():
+        _light_overlay = pygame.Surface(screen.get_size())
+        if pygame.display.get_surface():
+            _light_overlay = _light_overlay.convert()
+        track_memory(_light_overlay, "surfaces", surface_bytes(_light_overlay))
+    _light_overlay.fill(DARK_AMBIENT)
+    ox, oy = offset
+    blits = []
+    for x, y, radius, color in scene_lights():
+        mask = get_light_mask(radius, color)
+        blits.append((mask, (x - ox - radius, y - oy - radius), None, pygame.BLEND_RGB_ADD))
+    _light_overlay.blits(blits, doreturn=False)
+    screen.blit(_light_overlay, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+
 # ---------------- UI ----------------
 
 def draw_title_screen(screen):
@@ -247,6 +831,9 @@ def draw_title_screen(screen):
     draw_text(screen, "Move: WASD/Arrows  •  Interact: E  •  Choose: 1/2/3",
               cx - FONT.size("Move: WASD/Arrows  •  Interact: E  •  Choose: 1/2/3")[0] // 2,
               HEIGHT - 90, (200, 200, 200), FONT)
+    if jobs.busy():
+        pct = int(100 * jobs.overall_progress())
+        draw_text(screen, f"Composing music... {pct}%", 14, HEIGHT - 30, (150, 150, 160), FONT)
 
 def draw_dialog(screen):
     if not state.active_dialog:
@@ -283,6 +870,23 @@ def draw_ui(screen, player, props):
             pygame.draw.rect(screen, BLACK, (12, HEIGHT - 52, WIDTH - 24, 40), border_radius=10)
             draw_text(screen, f"Press E to interact with: {nearest.name}", 24, HEIGHT - 42, (240, 240, 240), FONT)
 
+def draw_memory_overlay(screen):
+    rep = memory_report()
+    lines = [f"mem total {rep['total'] / 1024:.0f} KB" + ("" if rep["tracing"] else " (tracemalloc off)")]
+    for cat, n in rep["live"].items():
+        approx = "~" if cat in rep["estimated"] else " "
+        lines.append(f"  {cat:<8}{approx}{n / 1024:8.1f} KB")
+    for cat, n in rep["python_breakdown"].items():
+        lines.append(f"    {cat:<6} {n / 1024:8.1f} KB")
+    for scene, n in rep["peak_by_scene"].items():
+        lines.append(f"  peak {scene:<10} {n / 1024:8.1f} KB")
+    h = 22 * len(lines) + 12
+    pygame.draw.rect(screen, BLACK, (WIDTH - 300, 80, 288, h), border_radius=8)
+    y = 86
+    for line in lines:
+        draw_text(screen, line, WIDTH - 290, y, CYAN, FONT)
+        y += 22
+
 def update_toast():
     if state.toast_timer > 0:
         state.toast_timer -= 1
@@ -292,6 +896,7 @@ def update_toast():
 # ---------------- Scenes ----------------
 
 def build_scene(scene_name):
+    traced_before = traced_bytes()
     all_sprites = pygame.sprite.Group()
     props = []
     player = Actor("You", "player", 120, HEIGHT // 2, radius=16, color=BLUE, speed=4)
@@ -328,7 +933,7 @@ def build_scene(scene_name):
     elif scene_name == "hallway":
         npc("Susan Simmons", 240, 520, color=GREEN, wander=False)
         prop("Notice Board", 520, 260, radius=26)
-        prop("Storage Door", 900, 520, radius=30)
+        prop("Storage Door", 1900, 520, radius=30)
         prop("Back to Class", 80, 120, radius=28)
 
     elif scene_name == "plan_room":
@@ -349,6 +954,7 @@ def build_scene(scene_name):
         prop("Stage Control", 720, 520, radius=28)
         prop("Big Reveal Spot", 920, 120, radius=38)
 
+    track_memory(all_sprites, "scene", max(0, traced_bytes() - traced_before))
     return player, all_sprites, props
 
 def nearest_interactable(player, props):
@@ -366,9 +972,18 @@ def nearest_interactable(player, props):
 def set_scene(new_scene):
     global player, all_sprites, props
     state.scene = new_scene
+    WORLD.size = SCENE_SIZES.get(new_scene, (WIDTH, HEIGHT))
     player, all_sprites, props = build_scene(state.scene)
+    camera.snap(player.rect)
+    chunk_cache.clear()
+    chunk_cache.max_chunks = view_chunks(*WORLD.size)
+    particles.clear()
+    memory_note_scene(new_scene)
     state.set_toast(f"Entered: {new_scene.upper()}", 150)
     start_room_music(new_scene)
+    pending = jobs.get(f"music:{new_scene}")
+    if pending:
+        pending.priority = JOB_HIGH
 
 # ---------------- Story logic ----------------
 
@@ -594,6 +1209,11 @@ def talk_to(name):
             def after(i):
                 state.objective = "IT'S TIME! Go to the Big Reveal Spot center stage."
                 state.set_toast("You cut the audio... the hologram flickers!", 240)
+                state.flags["holo_glitch"] = True
+                state.flags["lights_cut"] = True
+                panel = find_actor("Stage Control")
+                if panel:
+                    particles.emit(FX_SPARKLE, *panel.rect.center, 40, speed=3.0, life=50)
                 
             state.push_dialog(DialogChoice(
                 "A stage control panel. One switch labeled: “AUDIO / LIGHTS / HOLO.”",
@@ -646,6 +1266,23 @@ def ending(kind):
             "Courage is a kind of intelligence."
         )
 
+    teacher = find_actor("Mr. Smith")
+    if kind == "REVEAL":
+        # "Under bright lights..."
+        state.flags["lights_cut"] = False
+    if kind == "REVEAL" and teacher:
+        tx, ty = teacher.rect.center
+        particles.emit(FX_GLITCH, tx, ty - 30, 120, speed=6.0, life=40, spread=30)
+        particles.emit(FX_SPARKLE, tx, ty - 30, 60, speed=4.0, life=70, spread=20)
+    elif kind == "SAVE":
+        for friend in ("Susan Simmons", "Peter Thompson", "Duncan Dougal"):
+            a = find_actor(friend)
+            if a:
+                particles.emit(FX_SPARKLE, *a.rect.center, 30, speed=2.0, life=80, spread=12)
+    else:
+        for cx in range(100, WIDTH, 200):
+            particles.emit(FX_CONFETTI, cx, 90, 50, speed=4.0, life=150, spread=20)
+
     # FIX: DO NOT CALL next_dialog() HERE.
     # try_choice() will call next_dialog() after this function returns,
     # which will pop this dialog off the queue and show it.
@@ -693,20 +1330,33 @@ def try_choice(key):
     # logic: advance to the next dialog in queue
     state.next_dialog()
 
-def draw_background(screen):
-    if state.scene == "schoolyard":
-        screen.fill((25, 50, 40))
-    elif state.scene == "classroom":
-        screen.fill((30, 45, 55))
-    elif state.scene == "hallway":
-        screen.fill((45, 35, 35))
-    elif state.scene == "plan_room":
-        screen.fill((30, 30, 45))
-    else:
-        screen.fill((35, 25, 40))
-
-    for x in range(0, WIDTH, 80):
-        pygame.draw.line(screen, (0, 0, 0), (x, 72), (x, HEIGHT), 1)
+def draw_background(screen, cam=None):
+    view = cam.rect if cam else screen.get_rect()
+    if WORLD.width <= view.width and WORLD.height <= view.height:
+        # fits on screen: a fill and a few lines are cheaper than 3 MB of tiles
+        draw_floor(screen, state.scene, view.x, view.y)
+        return
+    x0, y0 = view.left // CHUNK_SIZE, view.top // CHUNK_SIZE
+    x1, y1 = (view.right - 1) // CHUNK_SIZE, (view.bottom - 1) // CHUNK_SIZE
+    blits = []
+    for cy in range(y0, y1 + 1):
+        for cx in range(x0, x1 + 1):
+            chunk = chunk_cache.get(state.scene, cx, cy)
+            blits.append((chunk, (cx * CHUNK_SIZE - view.x, cy * CHUNK_SIZE - view.y)))
+    screen.blits(blits, doreturn=False)
+
+def draw_play_frame(screen):
+    camera.follow(player.rect)
+    offset = camera.offset()
+    draw_background(screen, camera)
+    for a in all_sprites:
+        if camera.visible(a.rect):
+            draw_actor(screen, a, offset)
+    draw_lighting(screen, offset)
+    particles.step(screen, offset)
+
+    draw_ui(screen, player, props)
+    draw_dialog(screen)
 
 # ---------------- Pygbag async main ----------------
 
@@ -714,6 +1364,10 @@ async def main():
     global FONT, BIG, HUGE
     global player, all_sprites, props
     global SFX_SELECT, SFX_INTERACT, ROOM_MUSIC
+    global show_memory
+
+    if TRACE_MEMORY:
+        start_memory_tracing()
 
     pygame.init()
     pygame.display.set_mode((WIDTH, HEIGHT))
@@ -724,6 +1378,9 @@ async def main():
     FONT = pygame.font.Font(None, 24)
     BIG = pygame.font.Font(None, 40)
     HUGE = pygame.font.Font(None, 64)
+    for f in (FONT, BIG, HUGE):
+        track_memory(f, "fonts", font_bytes())
+    bake_particle_sprites()
 
     # Audio Init with Arpeggios
     try:
@@ -731,14 +1388,8 @@ async def main():
         SFX_SELECT = make_tone(880, ms=80, volume=0.25, wave="square")
         SFX_INTERACT = make_tone(440, ms=70, volume=0.20, wave="triangle")
 
-        # Create simple musical loops
-        ROOM_MUSIC = {
-            "schoolyard": make_arpeggio([220, 261, 330, 261], ms_per_note=350, volume=0.10),
-            "classroom":  make_arpeggio([246, 293, 246, 196], ms_per_note=400, volume=0.10),
-            "hallway":    make_arpeggio([196, 220, 196, 164], ms_per_note=400, volume=0.10),
-            "plan_room":  make_arpeggio([262, 330, 392, 330], ms_per_note=300, volume=0.10),
-            "finale":     make_arpeggio([146, 174, 146, 130], ms_per_note=250, volume=0.12),
-        }
+        # Room loops are composed in the background, a slice per frame
+        queue_room_music()
     except Exception:
         SFX_SELECT = None
         SFX_INTERACT = None
@@ -746,10 +1397,12 @@ async def main():
 
     clock = pygame.time.Clock()
     player, all_sprites, props = build_scene(state.scene)
+    memory_note_scene(state.mode)
 
     running = True
     while running:
-        clock.tick(FPS)
+        dt = clock.tick(FPS)
+        frame_start = time.perf_counter()
         keys = pygame.key.get_pressed()
 
         for event in pygame.event.get():
@@ -760,6 +1413,12 @@ async def main():
                 if event.key == pygame.K_ESCAPE:
                     running = False
 
+                if event.key == pygame.K_F3:
+                    show_memory = not show_memory
+                    start_memory_tracing()
+                elif event.key == pygame.K_F4:
+                    dump_memory_diff()
+
                 if state.mode == "title":
                     if event.key == pygame.K_RETURN:
                         begin_game()
@@ -773,6 +1432,9 @@ async def main():
 
         if state.mode == "title":
             draw_title_screen(screen)
+            if show_memory:
+                draw_memory_overlay(screen)
+            run_background_jobs(frame_start, dt)
             pygame.display.flip()
             await asyncio.sleep(0)
             continue
@@ -783,14 +1445,13 @@ async def main():
                 a.update()
 
         update_toast()
+        update_effects()
 
-        draw_background(screen)
-        for a in all_sprites:
-            draw_actor(screen, a)
-
-        draw_ui(screen, player, props)
-        draw_dialog(screen)
+        draw_play_frame(screen)
+        if show_memory:
+            draw_memory_overlay(screen)
 
+        run_background_jobs(frame_start, dt)
         pygame.display.flip()
         await asyncio.sleep(0)
 